@@ -3,8 +3,9 @@ Chainlit Weather Agent con streaming asincrono e visualizzazione tool calls
 """
 
 import os
-import asyncio
+from collections import deque
 from datetime import datetime
+import orjson
 from dotenv import load_dotenv
 from loguru import logger
 
@@ -84,6 +85,14 @@ def get_llm(provider: str, model: str):
         )
 
 
+def build_agent(llm, tools):
+    """Crea l'agent ReAct abilitando le tool call parallele"""
+    # Con i tools già legati, create_react_agent riusa il binding così com'è:
+    # più tool call nello stesso turno vengono eseguite in concorrenza dal ToolNode
+    llm_with_tools = llm.bind_tools(tools, parallel_tool_calls=True)
+    return create_react_agent(llm_with_tools, tools)
+
+
 @cl.on_chat_start
 async def start():
     """Inizializza la sessione chat"""
@@ -126,14 +135,15 @@ async def start():
         
         # Crea agent
         logger.info("Creazione agent...")
-        agent = create_react_agent(llm, tools)
+        agent = build_agent(llm, tools)
         
         # Salva in sessione
         cl.user_session.set("agent", agent)
         cl.user_session.set("mcp_client", client)
+        cl.user_session.set("tools", tools)
         cl.user_session.set("provider", provider)
         cl.user_session.set("model", model)
-        cl.user_session.set("conversation_history", [])
+        cl.user_session.set("conversation_history", deque(maxlen=200))
         
         # Messaggio di conferma
         await cl.Message(
@@ -168,12 +178,11 @@ async def settings_update(settings):
         # Ottieni nuovo LLM
         llm = get_llm(provider, model)
         
-        # Ottieni tools dalla sessione
-        client = cl.user_session.get("mcp_client")
-        tools = await client.get_tools()
+        # Riusa i tools già caricati all'avvio (non dipendono dal LLM)
+        tools = cl.user_session.get("tools")
         
         # Ricrea agent
-        agent = create_react_agent(llm, tools)
+        agent = build_agent(llm, tools)
         
         # Aggiorna sessione
         cl.user_session.set("agent", agent)
@@ -188,48 +197,53 @@ async def settings_update(settings):
 
 async def stream_tool_call(tool_name: str, tool_args: dict, msg: cl.Message):
     """Mostra la chiamata al tool in modo animato"""
-    # Header
-    await msg.stream_token(f"\n\n🔧 **Chiamata tool: `{tool_name}`**\n\n")
-    
-    # Argomenti
-    await msg.stream_token("```json\n")
-    import json
-    args_json = json.dumps(tool_args, indent=2, ensure_ascii=False)
+    args_json = orjson.dumps(tool_args, option=orjson.OPT_INDENT_2).decode()
     
-    # Simula typing degli argomenti
-    for char in args_json:
-        await msg.stream_token(char)
-        await asyncio.sleep(0.005)  # Velocità typing
-    
-    await msg.stream_token("\n```\n\n")
+    # Header + argomenti in un unico frame
+    await msg.stream_token(
+        f"\n\n🔧 **Chiamata tool: `{tool_name}`**\n\n```json\n{args_json}\n```\n\n"
+    )
 
 
 async def stream_tool_response(tool_name: str, response: str, msg: cl.Message):
     """Mostra la risposta del tool in modo collassabile"""
-    await msg.stream_token(f"📦 **Risposta da `{tool_name}`:**\n\n")
+    header = f"📦 **Risposta da `{tool_name}`:**\n\n"
     
     # Se la risposta è lunga, mostra solo l'inizio
     if len(response) > 200:
         preview = response[:200] + "..."
-        await msg.stream_token(f"```\n{preview}\n```\n\n")
+        await msg.stream_token(f"{header}```\n{preview}\n```\n\n")
         
         # Aggiungi elemento collapsabile con la risposta completa
-        elements = msg.elements or []
-        elements.append(
+        if msg.elements is None:
+            msg.elements = []
+        msg.elements.append(
             cl.Text(
-                name=f"tool_response_{tool_name}",
+                name=f"tool_response_{tool_name}_{id(response)}",
                 content=response,
                 display="inline",
                 language="text"
             )
         )
-        msg.elements = elements
     else:
         # Risposta breve, mostrala direttamente
-        for char in response:
-            await msg.stream_token(char)
-            await asyncio.sleep(0.01)
-        await msg.stream_token("\n\n")
+        await msg.stream_token(f"{header}{response}\n\n")
+
+
+def build_step_content(tool_events: list[tuple[str, str, str]]) -> str:
+    """Compone il markdown della reasoning chain dagli eventi dei tool"""
+    step_content = []
+    for kind, tool_name, content in tool_events:
+        if kind == "thought":
+            step_content.append(f"💭 {content}")
+        elif kind == "call":
+            step_content.append(f"**Tool:** `{tool_name}`")
+            step_content.append(f"```json\n{content}\n```")
+        else:
+            step_content.append(f"**Risposta da {tool_name}:**")
+            step_content.append(f"```\n{content}\n```")
+            step_content.append("---")
+    return "\n\n".join(step_content)
 
 
 @cl.on_message
@@ -259,83 +273,87 @@ async def main(message: cl.Message):
             
             # Variabili per tracciare lo stato
             tool_calls_made = []
-            step_content = []
+            # Eventi (tipo, tool, contenuto): il markdown si compone a fine stream
+            tool_events = []
             
-            # Step 1: Mostra "sta pensando"
-            await cl.Message(
-                content="",
-                author="Assistant"
-            ).send()
+            # I token della risposta finale vengono inoltrati direttamente su msg
+            final_response = ""
+            
+            # Step aperti per le tool call in corso, indicizzati per run_id
+            tool_steps = {}
             
             # Aggiorna status
             async with cl.Step(name="💭 Sto analizzando la richiesta", type="run") as thinking_step:
-                # Esegui l'agent in background e monitora
-                response = await agent.ainvoke({
-                    "messages": [{"role": "user", "content": user_message}]
-                })
-            
-            # Analizza la risposta per estrarre tool calls e risultati
-            final_response = ""
-            
-            for i, response_msg in enumerate(response["messages"]):
-                msg_type = type(response_msg).__name__
-                
-                # Tool Call - Aggiungi allo step
-                if msg_type == "AIMessage" and hasattr(response_msg, 'tool_calls') and response_msg.tool_calls:
-                    for tool_call in response_msg.tool_calls:
-                        tool_name = tool_call.get("name", "unknown")
-                        tool_args = tool_call.get("args", {})
+                # Esegui l'agent in streaming e inoltra gli eventi man mano
+                async for event in agent.astream_events(
+                    {"messages": [{"role": "user", "content": user_message}]},
+                    version="v2",
+                ):
+                    kind = event["event"]
+                    
+                    # Token della risposta - inoltrali subito alla UI
+                    if kind == "on_chat_model_stream":
+                        token = event["data"]["chunk"].content
+                        if isinstance(token, list):
+                            # Anthropic restituisce una lista di content block
+                            token = "".join(
+                                part.get("text", "") for part in token if isinstance(part, dict)
+                            )
+                        if token:
+                            final_response += token
+                            await msg.stream_token(token)
+                    
+                    # Tool Call - Apri uno step dedicato
+                    elif kind == "on_tool_start":
+                        tool_name = event.get("name", "unknown")
+                        tool_args = event["data"].get("input", {})
                         tool_calls_made.append(tool_name)
                         
-                        # Aggiorna lo status live
-                        async with cl.Step(name=f"🔧 Chiamata: {tool_name}", type="tool") as tool_step:
-                            import json
-                            tool_step.input = json.dumps(tool_args, indent=2, ensure_ascii=False)
+                        # Il testo scritto prima di una tool call non è la risposta
+                        # finale: spostalo nella reasoning chain e svuota msg
+                        if final_response:
+                            tool_events.append(("thought", "", final_response))
+                            final_response = ""
+                            msg.content = ""
+                            await msg.update()
                         
-                        # Aggiungi allo step content
-                        step_content.append(f"**Tool:** `{tool_name}`")
-                        step_content.append(f"```json\n{json.dumps(tool_args, indent=2, ensure_ascii=False)}\n```")
-                
-                # Tool Response - Aggiungi allo step
-                elif msg_type == "ToolMessage":
-                    tool_name = getattr(response_msg, 'name', 'unknown')
-                    tool_content = response_msg.content
-                    
-                    # Aggiorna status
-                    async with cl.Step(name=f"📦 Risposta: {tool_name}", type="tool") as response_step:
-                        response_step.output = tool_content[:500] + ("..." if len(tool_content) > 500 else "")
+                        args_json = orjson.dumps(tool_args, default=str, option=orjson.OPT_INDENT_2).decode()
+                        
+                        tool_step = cl.Step(name=f"🔧 Chiamata: {tool_name}", type="tool")
+                        tool_step.input = args_json
+                        await tool_step.send()
+                        tool_steps[event["run_id"]] = tool_step
+                        
+                        tool_events.append(("call", tool_name, args_json))
                     
-                    # Aggiungi allo step content
-                    step_content.append(f"**Risposta da {tool_name}:**")
-                    step_content.append(f"```\n{tool_content}\n```")
-                    step_content.append("---")
-                
-                # Risposta finale
-                elif msg_type == "AIMessage" and response_msg.content:
-                    final_response = response_msg.content
+                    # Tool Response - Chiudi lo step e aggiungi il risultato
+                    elif kind == "on_tool_end":
+                        tool_name = event.get("name", "unknown")
+                        output = event["data"].get("output")
+                        tool_content = getattr(output, "content", output)
+                        if not isinstance(tool_content, str):
+                            tool_content = str(tool_content)
+                        
+                        tool_step = tool_steps.pop(event["run_id"], None)
+                        if tool_step:
+                            tool_step.output = tool_content[:500] + ("..." if len(tool_content) > 500 else "")
+                            await tool_step.update()
+                        
+                        tool_events.append(("response", tool_name, tool_content))
             
             # Popola lo step con tutta la catena
-            step.output = "\n\n".join(step_content)
-            
-            # Ora invia SOLO la risposta finale con streaming
-            final_msg = cl.Message(content="", author="Assistant")
-            
-            # Streaming della risposta finale
-            for char in final_response:
-                await final_msg.stream_token(char)
-                await asyncio.sleep(0.01)
+            step.output = build_step_content(tool_events)
             
-            await final_msg.send()
+            await msg.send()
             
             # Salva nella cronologia
-            conversation_history = cl.user_session.get("conversation_history", [])
-            conversation_history.append({
+            # La deque è mutata in place: non serve risalvarla in sessione
+            cl.user_session.get("conversation_history").append({
                 "timestamp": datetime.now().isoformat(),
                 "user": user_message,
                 "assistant": final_response,
                 "tools_used": tool_calls_made
             })
-            cl.user_session.set("conversation_history", conversation_history)
             
             logger.info(f"Risposta completata. Tools usati: {tool_calls_made}")
             
@@ -344,6 +362,9 @@ async def main(message: cl.Message):
             import traceback
             error_trace = traceback.format_exc()
             step.output = f"❌ Errore:\n```\n{error_trace}\n```"
+            # Chiudi l'eventuale risposta rimasta a metà dello streaming
+            if msg.content:
+                await msg.send()
             await cl.Message(
                 content=f"❌ Si è verificato un errore durante l'elaborazione.",
                 author="Assistant"
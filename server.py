@@ -4,188 +4,190 @@ MCP Server per WeatherAPI.com
 Implementa 5 endpoint principali: Current, Forecast, History, Search, Astronomy
 """
 
+import contextlib
 import os
-import sys
 
 # CRITICO: Disabilita COMPLETAMENTE stdout PRIMA di qualsiasi import
-# Questo evita che dotenv o altri moduli loggino su stdout
-_original_stdout = sys.stdout
-sys.stdout = open(os.devnull, 'w')
-
-# Ora carica dotenv senza output
-from dotenv import load_dotenv
-load_dotenv()
-
-# Ripristina stdout solo per MCP (che usa stdio in modo controllato)
-sys.stdout = _original_stdout
+# Questo evita che dotenv o altri moduli loggino su stdout.
+# All'uscita dal blocco stdout viene ripristinato per MCP (che usa stdio
+# in modo controllato) e il file di /dev/null viene chiuso.
+with open(os.devnull, 'w') as _devnull, contextlib.redirect_stdout(_devnull):
+    from dotenv import load_dotenv
+    load_dotenv()
 
 import asyncio
 import json
 from datetime import datetime
 from typing import Any
-from urllib.parse import urlencode
 
 import httpx
+import orjson
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
 from mcp.types import Tool, TextContent
 
 # Configurazione
 API_KEY = os.getenv("WEATHERAPI_KEY", "")
-BASE_URL = "http://api.weatherapi.com/v1"
+BASE_URL = "https://api.weatherapi.com/v1"
 
 server = Server("weatherapi-server")
 
-
-def build_url(endpoint: str, params: dict[str, Any]) -> str:
-    """Costruisce l'URL completo per la richiesta API"""
-    params["key"] = API_KEY
-    query_string = urlencode({k: v for k, v in params.items() if v is not None})
-    return f"{BASE_URL}/{endpoint}.json?{query_string}"
+# Client HTTP condiviso dal processo: le connessioni keep-alive vengono riusate
+# solo finché il processo resta vivo, cioè se il client MCP tiene aperta la sessione
+_HTTP = httpx.AsyncClient(
+    params={"key": API_KEY},  # la API key è costante: httpx la unisce a ogni richiesta
+    timeout=30.0,
+    limits=httpx.Limits(max_keepalive_connections=20, max_connections=50),
+)
 
 
-async def make_request(url: str) -> dict[str, Any]:
+async def make_request(endpoint: str, params: dict[str, Any]) -> dict[str, Any]:
     """Effettua la richiesta HTTP e gestisce errori"""
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        response = await client.get(url)
-        response.raise_for_status()
-        return response.json()
-
-
-@server.list_tools()
-async def list_tools() -> list[Tool]:
-    """Elenca tutti gli strumenti disponibili"""
-    return [
-        Tool(
-            name="get_current_weather",
-            description="Ottiene le condizioni meteo attuali per una località. "
-            "Supporta città, coordinate lat/lon, codici postali, IP.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "q": {
-                        "type": "string",
-                        "description": "Località: nome città (es: London), "
-                        "lat,lon (es: 48.8567,2.3508), "
-                        "codice postale (es: 10001), IP address",
-                    },
-                    "aqi": {
-                        "type": "string",
-                        "enum": ["yes", "no"],
-                        "description": "Includi dati qualità dell'aria",
-                        "default": "no",
-                    },
-                    "lang": {
-                        "type": "string",
-                        "description": "Codice lingua (es: it, en, fr, de)",
-                        "default": "en",
-                    },
+    # L'encoding della query string è delegato a httpx
+    params = {k: v for k, v in params.items() if v is not None}
+    response = await _HTTP.get(f"{BASE_URL}/{endpoint}.json", params=params)
+    response.raise_for_status()
+    return orjson.loads(response.content)
+
+
+# Schemi dei tool costanti: costruiti una sola volta all'import
+_TOOLS: list[Tool] = [
+    Tool(
+        name="get_current_weather",
+        description="Ottiene le condizioni meteo attuali per una località. "
+        "Supporta città, coordinate lat/lon, codici postali, IP.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "q": {
+                    "type": "string",
+                    "description": "Località: nome città (es: London), "
+                    "lat,lon (es: 48.8567,2.3508), "
+                    "codice postale (es: 10001), IP address",
                 },
-                "required": ["q"],
-            },
-        ),
-        Tool(
-            name="get_forecast",
-            description="Ottiene previsioni meteo fino a 14 giorni. "
-            "Include dati orari, astronomia, allerte meteo.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "q": {
-                        "type": "string",
-                        "description": "Località (città, lat,lon, codice postale)",
-                    },
-                    "days": {
-                        "type": ["integer", "string"],
-                        "description": "Numero di giorni di previsione (1-14)",
-                        "minimum": 1,
-                        "maximum": 14,
-                        "default": 3,
-                    },
-                    "aqi": {
-                        "type": "string",
-                        "enum": ["yes", "no"],
-                        "description": "Includi qualità dell'aria",
-                        "default": "no",
-                    },
-                    "alerts": {
-                        "type": "string",
-                        "enum": ["yes", "no"],
-                        "description": "Includi allerte meteo",
-                        "default": "yes",
-                    },
-                    "lang": {
-                        "type": "string",
-                        "description": "Codice lingua",
-                        "default": "en",
-                    },
+                "aqi": {
+                    "type": "string",
+                    "enum": ["yes", "no"],
+                    "description": "Includi dati qualità dell'aria",
+                    "default": "no",
+                },
+                "lang": {
+                    "type": "string",
+                    "description": "Codice lingua (es: it, en, fr, de)",
+                    "default": "en",
                 },
-                "required": ["q"],
             },
-        ),
-        Tool(
-            name="get_history",
-            description="Ottiene dati meteo storici dal 1 gennaio 2010. "
-            "Include temperatura, precipitazioni, vento per data specifica.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "q": {
-                        "type": "string",
-                        "description": "Località (città, lat,lon, codice postale)",
-                    },
-                    "dt": {
-                        "type": "string",
-                        "description": "Data in formato yyyy-MM-dd (es: 2023-01-15)",
-                    },
-                    "end_dt": {
-                        "type": "string",
-                        "description": "Data finale per range (opzionale, max 30 giorni)",
-                    },
-                    "lang": {
-                        "type": "string",
-                        "description": "Codice lingua",
-                        "default": "en",
-                    },
+            "required": ["q"],
+        },
+    ),
+    Tool(
+        name="get_forecast",
+        description="Ottiene previsioni meteo fino a 14 giorni. "
+        "Include dati orari, astronomia, allerte meteo.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "q": {
+                    "type": "string",
+                    "description": "Località (città, lat,lon, codice postale)",
+                },
+                "days": {
+                    "type": ["integer", "string"],
+                    "description": "Numero di giorni di previsione (1-14)",
+                    "minimum": 1,
+                    "maximum": 14,
+                    "default": 3,
+                },
+                "aqi": {
+                    "type": "string",
+                    "enum": ["yes", "no"],
+                    "description": "Includi qualità dell'aria",
+                    "default": "no",
+                },
+                "alerts": {
+                    "type": "string",
+                    "enum": ["yes", "no"],
+                    "description": "Includi allerte meteo",
+                    "default": "yes",
+                },
+                "lang": {
+                    "type": "string",
+                    "description": "Codice lingua",
+                    "default": "en",
                 },
-                "required": ["q", "dt"],
             },
-        ),
-        Tool(
-            name="search_location",
-            description="Cerca località per nome. Utile per autocomplete "
-            "e trovare coordinate esatte prima di altre chiamate.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "q": {
-                        "type": "string",
-                        "description": "Termine di ricerca (es: 'Lond' per trovare Londra)",
-                    }
+            "required": ["q"],
+        },
+    ),
+    Tool(
+        name="get_history",
+        description="Ottiene dati meteo storici dal 1 gennaio 2010. "
+        "Include temperatura, precipitazioni, vento per data specifica.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "q": {
+                    "type": "string",
+                    "description": "Località (città, lat,lon, codice postale)",
+                },
+                "dt": {
+                    "type": "string",
+                    "description": "Data in formato yyyy-MM-dd (es: 2023-01-15)",
+                },
+                "end_dt": {
+                    "type": "string",
+                    "description": "Data finale per range (opzionale, max 30 giorni)",
+                },
+                "lang": {
+                    "type": "string",
+                    "description": "Codice lingua",
+                    "default": "en",
                 },
-                "required": ["q"],
             },
-        ),
-        Tool(
-            name="get_astronomy",
-            description="Ottiene dati astronomici: alba, tramonto, "
-            "fasi lunari, levata/tramonto luna per una data specifica.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "q": {
-                        "type": "string",
-                        "description": "Località (città, lat,lon, codice postale)",
-                    },
-                    "dt": {
-                        "type": "string",
-                        "description": "Data in formato yyyy-MM-dd (opzionale, default oggi)",
-                    },
+            "required": ["q", "dt"],
+        },
+    ),
+    Tool(
+        name="search_location",
+        description="Cerca località per nome. Utile per autocomplete "
+        "e trovare coordinate esatte prima di altre chiamate.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "q": {
+                    "type": "string",
+                    "description": "Termine di ricerca (es: 'Lond' per trovare Londra)",
+                }
+            },
+            "required": ["q"],
+        },
+    ),
+    Tool(
+        name="get_astronomy",
+        description="Ottiene dati astronomici: alba, tramonto, "
+        "fasi lunari, levata/tramonto luna per una data specifica.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "q": {
+                    "type": "string",
+                    "description": "Località (città, lat,lon, codice postale)",
+                },
+                "dt": {
+                    "type": "string",
+                    "description": "Data in formato yyyy-MM-dd (opzionale, default oggi)",
                 },
-                "required": ["q"],
             },
-        ),
-    ]
+            "required": ["q"],
+        },
+    ),
+]
+
+
+@server.list_tools()
+async def list_tools() -> list[Tool]:
+    """Elenca tutti gli strumenti disponibili"""
+    return _TOOLS
 
 
 @server.call_tool()
@@ -203,7 +205,7 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
 
     try:
         if name == "get_current_weather":
-            url = build_url(
+            data = await make_request(
                 "current",
                 {
                     "q": arguments["q"],
@@ -211,12 +213,11 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
                     "lang": arguments.get("lang", "en"),
                 },
             )
-            data = await make_request(url)
             
             location = data["location"]
             current = data["current"]
             
-            result = f"""**Meteo Attuale - {location['name']}, {location['country']}**
+            parts = [f"""**Meteo Attuale - {location['name']}, {location['country']}**
 Ora locale: {location['localtime']}
 
 🌡️ Temperatura: {current['temp_c']}°C ({current['temp_f']}°F)
@@ -227,13 +228,13 @@ Ora locale: {location['localtime']}
 🌧️ Precipitazioni: {current['precip_mm']} mm
 👁️ Visibilità: {current['vis_km']} km
 ☀️ UV Index: {current['uv']}
-"""
+"""]
             
             if arguments.get("aqi") == "yes" and "air_quality" in current:
                 aqi = current["air_quality"]
-                result += f"\n**Qualità dell'Aria**\nUS EPA Index: {aqi.get('us-epa-index', 'N/A')}\n"
+                parts.append(f"\n**Qualità dell'Aria**\nUS EPA Index: {aqi.get('us-epa-index', 'N/A')}\n")
             
-            return [TextContent(type="text", text=result)]
+            return [TextContent(type="text", text="".join(parts))]
 
         elif name == "get_forecast":
             # Converti days in intero se è una stringa
@@ -241,7 +242,7 @@ Ora locale: {location['localtime']}
             if isinstance(days, str):
                 days = int(days)
             
-            url = build_url(
+            data = await make_request(
                 "forecast",
                 {
                     "q": arguments["q"],
@@ -251,16 +252,15 @@ Ora locale: {location['localtime']}
                     "lang": arguments.get("lang", "en"),
                 },
             )
-            data = await make_request(url)
             
             location = data["location"]
             forecast = data["forecast"]["forecastday"]
             
-            result = f"**Previsioni Meteo - {location['name']}, {location['country']}**\n\n"
+            parts = [f"**Previsioni Meteo - {location['name']}, {location['country']}**\n\n"]
             
             for day in forecast:
                 d = day["day"]
-                result += f"""📅 {day['date']}
+                parts.append(f"""📅 {day['date']}
 🌡️ Min/Max: {d['mintemp_c']}°C / {d['maxtemp_c']}°C
 ☁️ {d['condition']['text']}
 🌧️ Precipitazioni: {d['totalprecip_mm']} mm
@@ -268,17 +268,17 @@ Ora locale: {location['localtime']}
 💧 Umidità media: {d['avghumidity']}%
 ☀️ UV Index: {d['uv']}
 
-"""
+""")
             
             if "alerts" in data and data["alerts"].get("alert"):
-                result += "⚠️ **ALLERTE METEO**\n"
+                parts.append("⚠️ **ALLERTE METEO**\n")
                 for alert in data["alerts"]["alert"]:
-                    result += f"- {alert['event']}: {alert['headline']}\n"
+                    parts.append(f"- {alert['event']}: {alert['headline']}\n")
             
-            return [TextContent(type="text", text=result)]
+            return [TextContent(type="text", text="".join(parts))]
 
         elif name == "get_history":
-            url = build_url(
+            data = await make_request(
                 "history",
                 {
                     "q": arguments["q"],
@@ -287,16 +287,15 @@ Ora locale: {location['localtime']}
                     "lang": arguments.get("lang", "en"),
                 },
             )
-            data = await make_request(url)
             
             location = data["location"]
             forecast = data["forecast"]["forecastday"]
             
-            result = f"**Dati Storici - {location['name']}, {location['country']}**\n\n"
+            parts = [f"**Dati Storici - {location['name']}, {location['country']}**\n\n"]
             
             for day in forecast:
                 d = day["day"]
-                result += f"""📅 {day['date']}
+                parts.append(f"""📅 {day['date']}
 🌡️ Min/Max/Media: {d['mintemp_c']}°C / {d['maxtemp_c']}°C / {d['avgtemp_c']}°C
 ☁️ {d['condition']['text']}
 🌧️ Precipitazioni totali: {d['totalprecip_mm']} mm
@@ -304,36 +303,34 @@ Ora locale: {location['localtime']}
 💧 Umidità media: {d['avghumidity']}%
 👁️ Visibilità media: {d['avgvis_km']} km
 
-"""
+""")
             
-            return [TextContent(type="text", text=result)]
+            return [TextContent(type="text", text="".join(parts))]
 
         elif name == "search_location":
-            url = build_url("search", {"q": arguments["q"]})
-            data = await make_request(url)
+            data = await make_request("search", {"q": arguments["q"]})
             
             if not data:
                 return [TextContent(type="text", text="Nessuna località trovata.")]
             
-            result = "**Località trovate:**\n\n"
+            parts = ["**Località trovate:**\n\n"]
             for loc in data:
-                result += f"""📍 {loc['name']}, {loc['region']}, {loc['country']}
+                parts.append(f"""📍 {loc['name']}, {loc['region']}, {loc['country']}
    Coordinate: {loc['lat']}, {loc['lon']}
    ID: {loc['id']}
 
-"""
+""")
             
-            return [TextContent(type="text", text=result)]
+            return [TextContent(type="text", text="".join(parts))]
 
         elif name == "get_astronomy":
-            url = build_url(
+            data = await make_request(
                 "astronomy",
                 {
                     "q": arguments["q"],
                     "dt": arguments.get("dt"),
                 },
             )
-            data = await make_request(url)
             
             location = data["location"]
             astro = data["astronomy"]["astro"]
@@ -373,12 +370,15 @@ Data: {data['location']['localtime'].split()[0]}
 
 async def main():
     """Avvia il server MCP"""
-    async with stdio_server() as (read_stream, write_stream):
-        await server.run(
-            read_stream,
-            write_stream,
-            server.create_initialization_options(),
-        )
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            await server.run(
+                read_stream,
+                write_stream,
+                server.create_initialization_options(),
+            )
+    finally:
+        await _HTTP.aclose()
 
 
 if __name__ == "__main__":
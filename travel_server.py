@@ -4,22 +4,19 @@ MCP Server per Travel Planning
 Suggerisce attività, ristoranti e itinerari basati su località e condizioni
 """
 
+import contextlib
 import os
-import sys
 
-# Disabilita stdout per MCP
-_original_stdout = sys.stdout
-sys.stdout = open(os.devnull, 'w')
-
-from dotenv import load_dotenv
-load_dotenv()
-
-sys.stdout = _original_stdout
+# Disabilita stdout per MCP (il file di /dev/null viene chiuso all'uscita)
+with open(os.devnull, 'w') as _devnull, contextlib.redirect_stdout(_devnull):
+    from dotenv import load_dotenv
+    load_dotenv()
 
 import asyncio
 import json
 from datetime import datetime
-from typing import Any, List, Dict
+from itertools import chain
+from typing import Any, List, Dict, NamedTuple
 
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
@@ -29,7 +26,7 @@ server = Server("travel-planner-server")
 
 
 # Database simulato di attività (in produzione useresti un vero DB o API)
-ACTIVITIES_DB = {
+_ACTIVITIES_RAW = {
     "indoor": [
         {
             "name": "Musei e Gallerie d'Arte",
@@ -122,6 +119,33 @@ ACTIVITIES_DB = {
     ]
 }
 
+
+class Activity(NamedTuple):
+    """Attività del DB in forma compatta: campi accessibili per indice"""
+    name: str
+    description: str
+    suitable: frozenset[str]  # classi meteo adatte
+    duration: str
+    type: str
+    short: bool  # adatta a una durata breve (1-2h)
+
+
+# Normalizza il DB una sola volta all'import
+ACTIVITIES_DB = {
+    category: tuple(
+        Activity(
+            name=a["name"],
+            description=a["description"],
+            suitable=frozenset(a["suitable_weather"]),
+            duration=a["duration"],
+            type=a["type"],
+            short="1-2" in a["duration"],
+        )
+        for a in activities
+    )
+    for category, activities in _ACTIVITIES_RAW.items()
+}
+
 RESTAURANTS_DB = {
     "Milano": [
         {"name": "Trattoria Milanese", "type": "tradizionale", "price": "€€", "specialty": "Cucina milanese"},
@@ -158,276 +182,363 @@ def classify_weather(weather_condition: str, temp: float) -> str:
         return "partly_cloudy"
 
 
-@server.list_tools()
-async def list_tools() -> list[Tool]:
-    """Elenca tutti gli strumenti disponibili"""
-    return [
-        Tool(
-            name="suggest_activities",
-            description="Suggerisce attività basate sulle condizioni meteo e preferenze. "
-            "Usa questo tool DOPO aver ottenuto le previsioni meteo dal weather agent.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "location": {
-                        "type": "string",
-                        "description": "Località (es: Milano, Roma)",
-                    },
-                    "weather_condition": {
-                        "type": "string",
-                        "description": "Condizione meteo attuale/prevista (es: 'Sunny', 'Rainy', 'Partly cloudy')",
-                    },
-                    "temperature": {
-                        "type": "number",
-                        "description": "Temperatura in gradi Celsius",
-                    },
-                    "preferences": {
-                        "type": "array",
-                        "items": {"type": "string"},
-                        "description": "Preferenze utente: cultura, sport, food, shopping, relax, natura",
-                        "default": [],
-                    },
-                    "duration": {
-                        "type": "string",
-                        "description": "Durata disponibile: short (1-2h), medium (2-4h), long (4-8h)",
-                        "default": "medium",
-                    },
+# Tutte le classi restituite da classify_weather
+ALL_WEATHER_CLASSES = ("rain", "snow", "sunny", "hot", "cold", "mild", "partly_cloudy")
+
+# Un bit per ogni tipo di attività: il filtro sulle preferenze diventa un AND tra interi
+_TYPE_BITS = {
+    activity_type: 1 << position
+    for position, activity_type in enumerate(
+        dict.fromkeys(activity.type for activity in chain.from_iterable(ACTIVITIES_DB.values()))
+    )
+}
+_ALL_TYPES = (1 << len(_TYPE_BITS)) - 1
+
+# Coppie (bit del tipo, attività) per categoria, nell'ordine del DB
+_ACTIVITIES_WITH_BITS = {
+    category: tuple((_TYPE_BITS[activity.type], activity) for activity in activities)
+    for category, activities in ACTIVITIES_DB.items()
+}
+
+# Indice categoria -> classe meteo -> coppie adatte, costruito all'import
+# (ACTIVITIES_DB è statico). Le attività "any" compaiono in ogni classe e
+# l'ordine originale del DB è preservato
+_ACTIVITIES_BY_WEATHER = {
+    category: {
+        weather_class: tuple(
+            (bit, activity) for bit, activity in pairs
+            if weather_class in activity.suitable or "any" in activity.suitable
+        )
+        for weather_class in ALL_WEATHER_CLASSES
+    }
+    for category, pairs in _ACTIVITIES_WITH_BITS.items()
+}
+
+
+def preferences_mask(preferences) -> int:
+    """Converte le preferenze nei bit dei tipi richiesti (tutti se non ce ne sono)"""
+    if not preferences:
+        return _ALL_TYPES
+    # Stesso test "in" del filtro originale, fatto una volta per tipo invece che per attività
+    return sum(bit for activity_type, bit in _TYPE_BITS.items() if activity_type in preferences)
+
+
+def select_activities(pairs, type_mask: int) -> list:
+    """Attività delle coppie (bit, attività) il cui tipo è nella maschera"""
+    return [activity for bit, activity in pairs if bit & type_mask]
+
+
+# Indice località -> budget -> ristoranti filtrati (con "€€" vanno bene tutti)
+_RESTAURANTS_BY_BUDGET = {
+    location: {
+        budget: tuple(r for r in restaurants if r["price"] == budget or budget == "€€")
+        for budget in ("€", "€€", "€€€")
+    }
+    for location, restaurants in RESTAURANTS_DB.items()
+}
+
+
+# Template delle righe dei risultati
+_ACTIVITY_TMPL = "%d. **%s**\n   - %s\n   - Durata: %s\n   - Tipo: %s\n\n"
+_RESTAURANT_TMPL = "%d. **%s**\n   - Tipo: %s\n   - Specialità: %s\n   - Prezzo: %s\n\n"
+_ITINERARY_ROW_TMPL = "**%s** %s %s\n\n"
+
+# Fasce orarie e icone dell'itinerario
+_TIMES = ("09:00", "11:00", "13:00", "15:00", "17:00", "19:00")
+_ACT_ICON, _REST_ICON = "🎯", "🍽️"
+
+# Consigli finali dell'itinerario, sempre uguali
+_ITINERARY_TIPS = (
+    "\n💡 **Consigli:**\n"
+    "- Porta sempre un ombrello pieghevole\n"
+    "- Prenota i ristoranti in anticipo\n"
+    "- Usa i mezzi pubblici o cammina\n"
+)
+
+
+# Abbigliamento consigliato per classe meteo
+_CLOTHING = {
+    "rain": "- Giacca impermeabile, ombrello, scarpe chiuse\n",
+    "cold": "- Cappotto, sciarpa, guanti, cappello\n",
+    "hot": "- Abbigliamento leggero, cappello, crema solare\n",
+}
+_DEFAULT_CLOTHING = "- Vestiti a strati, giacca leggera\n"
+
+# Parte fissa dei consigli di viaggio
+_TIPS_TAIL = (
+    "\n🎒 **Cosa portare:**\n"
+    "- Bottiglia d'acqua riutilizzabile\n"
+    "- Power bank per smartphone\n"
+    "- Mappa offline della città\n"
+    "\n🚇 **Trasporti:**\n"
+    "- Acquista biglietti giornalieri per risparmiare\n"
+    "- App utili: Google Maps, Moovit\n"
+)
+
+
+# Schemi dei tool costanti: costruiti una sola volta all'import
+_TOOLS: list[Tool] = [
+    Tool(
+        name="suggest_activities",
+        description="Suggerisce attività basate sulle condizioni meteo e preferenze. "
+        "Usa questo tool DOPO aver ottenuto le previsioni meteo dal weather agent.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "location": {
+                    "type": "string",
+                    "description": "Località (es: Milano, Roma)",
+                },
+                "weather_condition": {
+                    "type": "string",
+                    "description": "Condizione meteo attuale/prevista (es: 'Sunny', 'Rainy', 'Partly cloudy')",
+                },
+                "temperature": {
+                    "type": "number",
+                    "description": "Temperatura in gradi Celsius",
+                },
+                "preferences": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Preferenze utente: cultura, sport, food, shopping, relax, natura",
+                    "default": [],
+                },
+                "duration": {
+                    "type": "string",
+                    "description": "Durata disponibile: short (1-2h), medium (2-4h), long (4-8h)",
+                    "default": "medium",
                 },
-                "required": ["location", "weather_condition", "temperature"],
             },
-        ),
-        Tool(
-            name="suggest_restaurants",
-            description="Suggerisce ristoranti nella località specificata",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "location": {
-                        "type": "string",
-                        "description": "Località (es: Milano)",
-                    },
-                    "meal_type": {
-                        "type": "string",
-                        "enum": ["breakfast", "lunch", "dinner", "aperitivo"],
-                        "description": "Tipo di pasto",
-                        "default": "lunch",
-                    },
-                    "cuisine_type": {
-                        "type": "string",
-                        "description": "Tipo di cucina preferita (tradizionale, street_food, fine_dining)",
-                        "default": "tradizionale",
-                    },
-                    "budget": {
-                        "type": "string",
-                        "enum": ["€", "€€", "€€€"],
-                        "description": "Budget",
-                        "default": "€€",
-                    },
+            "required": ["location", "weather_condition", "temperature"],
+        },
+    ),
+    Tool(
+        name="suggest_restaurants",
+        description="Suggerisce ristoranti nella località specificata",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "location": {
+                    "type": "string",
+                    "description": "Località (es: Milano)",
+                },
+                "meal_type": {
+                    "type": "string",
+                    "enum": ["breakfast", "lunch", "dinner", "aperitivo"],
+                    "description": "Tipo di pasto",
+                    "default": "lunch",
+                },
+                "cuisine_type": {
+                    "type": "string",
+                    "description": "Tipo di cucina preferita (tradizionale, street_food, fine_dining)",
+                    "default": "tradizionale",
+                },
+                "budget": {
+                    "type": "string",
+                    "enum": ["€", "€€", "€€€"],
+                    "description": "Budget",
+                    "default": "€€",
                 },
-                "required": ["location"],
             },
-        ),
-        Tool(
-            name="create_itinerary",
-            description="Crea un itinerario completo per la giornata combinando attività e ristoranti. "
-            "Usa DOPO aver ottenuto meteo, attività e ristoranti.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "location": {
-                        "type": "string",
-                        "description": "Località",
-                    },
-                    "activities": {
-                        "type": "array",
-                        "items": {"type": "string"},
-                        "description": "Lista di attività da includere",
-                    },
-                    "restaurants": {
-                        "type": "array",
-                        "items": {"type": "string"},
-                        "description": "Lista di ristoranti da includere",
-                    },
-                    "start_time": {
-                        "type": "string",
-                        "description": "Ora di inizio (es: 09:00)",
-                        "default": "09:00",
-                    },
+            "required": ["location"],
+        },
+    ),
+    Tool(
+        name="create_itinerary",
+        description="Crea un itinerario completo per la giornata combinando attività e ristoranti. "
+        "Usa DOPO aver ottenuto meteo, attività e ristoranti.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "location": {
+                    "type": "string",
+                    "description": "Località",
+                },
+                "activities": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Lista di attività da includere",
+                },
+                "restaurants": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Lista di ristoranti da includere",
+                },
+                "start_time": {
+                    "type": "string",
+                    "description": "Ora di inizio (es: 09:00)",
+                    "default": "09:00",
                 },
-                "required": ["location", "activities"],
             },
-        ),
-        Tool(
-            name="get_travel_tips",
-            description="Fornisce consigli di viaggio specifici per la località e il meteo",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "location": {
-                        "type": "string",
-                        "description": "Località",
-                    },
-                    "weather_condition": {
-                        "type": "string",
-                        "description": "Condizione meteo",
-                    },
-                    "temperature": {
-                        "type": "number",
-                        "description": "Temperatura in °C",
-                    },
+            "required": ["location", "activities"],
+        },
+    ),
+    Tool(
+        name="get_travel_tips",
+        description="Fornisce consigli di viaggio specifici per la località e il meteo",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "location": {
+                    "type": "string",
+                    "description": "Località",
+                },
+                "weather_condition": {
+                    "type": "string",
+                    "description": "Condizione meteo",
+                },
+                "temperature": {
+                    "type": "number",
+                    "description": "Temperatura in °C",
                 },
-                "required": ["location", "weather_condition", "temperature"],
             },
-        ),
+            "required": ["location", "weather_condition", "temperature"],
+        },
+    ),
+]
+
+
+@server.list_tools()
+async def list_tools() -> list[Tool]:
+    """Elenca tutti gli strumenti disponibili"""
+    return _TOOLS
+
+
+def suggest_activities(arguments: dict) -> str:
+    """Suggerisce attività in base a meteo, preferenze e durata"""
+    location = arguments["location"]
+    weather_condition = arguments["weather_condition"]
+    temperature = arguments["temperature"]
+    preferences = arguments.get("preferences", [])
+    duration = arguments.get("duration", "medium")
+    
+    # Classifica il meteo
+    weather_class = classify_weather(weather_condition, temperature)
+    
+    # Determina se preferire indoor o outdoor
+    prefer_indoor = weather_class in ["rain", "snow", "cold", "hot"]
+    
+    # Priorità: indoor se brutto tempo, outdoor se bello
+    primary_category = "indoor" if prefer_indoor else "outdoor"
+    secondary_category = "outdoor" if prefer_indoor else "indoor"
+    
+    # Filtra attività: il meteo è già risolto dal bucket, le preferenze dalla maschera
+    type_mask = preferences_mask(preferences)
+    suitable_activities = select_activities(
+        _ACTIVITIES_BY_WEATHER[primary_category][weather_class], type_mask
+    )
+    
+    # Aggiungi attività mixed
+    suitable_activities += select_activities(_ACTIVITIES_WITH_BITS["mixed"], type_mask)
+    
+    # Se poche attività, aggiungi dalla categoria secondaria
+    if len(suitable_activities) < 3:
+        suitable_activities += select_activities(_ACTIVITIES_WITH_BITS[secondary_category], type_mask)
+    
+    # Limita in base alla durata
+    if duration == "short":
+        suitable_activities = [a for a in suitable_activities if a.short]
+    
+    # Formatta risultato
+    conditions = "Al coperto consigliato" if prefer_indoor else "Perfetto per stare all'aperto"
+    out = [
+        f"**Attività consigliate per {location}**\n\n",
+        f"🌡️ Meteo: {weather_condition}, {temperature}°C\n",
+        f"📊 Condizioni: {conditions}\n\n",
     ]
+    
+    for i, activity in enumerate(suitable_activities[:5], 1):
+        out.append(_ACTIVITY_TMPL % (
+            i, activity.name, activity.description, activity.duration, activity.type
+        ))
+    
+    return "".join(out)
+
+
+def suggest_restaurants(arguments: dict) -> str:
+    """Suggerisce ristoranti nella località, filtrati per budget"""
+    location = arguments["location"]
+    meal_type = arguments.get("meal_type", "lunch")
+    cuisine_type = arguments.get("cuisine_type", "tradizionale")
+    budget = arguments.get("budget", "€€")
+    
+    # Ristoranti per località, già filtrati per budget
+    by_budget = _RESTAURANTS_BY_BUDGET.get(location, _RESTAURANTS_BY_BUDGET["default"])
+    filtered = by_budget.get(budget, ())
+    
+    out = [
+        f"**Ristoranti consigliati a {location}**\n\n",
+        f"🍽️ Pasto: {meal_type}\n",
+        f"💰 Budget: {budget}\n\n",
+    ]
+    
+    for i, restaurant in enumerate(filtered[:3], 1):
+        out.append(_RESTAURANT_TMPL % (
+            i, restaurant["name"], restaurant["type"], restaurant["specialty"], restaurant["price"]
+        ))
+    
+    return "".join(out)
+
+
+def create_itinerary(arguments: dict) -> str:
+    """Crea l'itinerario della giornata alternando attività e ristoranti"""
+    location = arguments["location"]
+    activities = arguments["activities"]
+    restaurants = arguments.get("restaurants") or []
+    start_time = arguments.get("start_time", "09:00")
+    
+    out = [
+        f"# 📅 Itinerario per {location}\n\n",
+        f"**Inizio:** {start_time}\n\n",
+    ]
+    
+    # Alterna attività e ristoranti
+    for i, activity in enumerate(activities[:3]):
+        out.append(_ITINERARY_ROW_TMPL % (_TIMES[i*2], _ACT_ICON, activity))
+        if i < len(restaurants):
+            out.append(_ITINERARY_ROW_TMPL % (_TIMES[i*2+1], _REST_ICON, restaurants[i]))
+    
+    out.append(_ITINERARY_TIPS)
+    
+    return "".join(out)
+
+
+def get_travel_tips(arguments: dict) -> str:
+    """Fornisce consigli di viaggio in base al meteo"""
+    location = arguments["location"]
+    weather_condition = arguments["weather_condition"]
+    temperature = arguments["temperature"]
+    
+    weather_class = classify_weather(weather_condition, temperature)
+    
+    out = [
+        f"**Consigli di Viaggio per {location}**\n\n",
+        "👕 **Abbigliamento:**\n",
+        _CLOTHING.get(weather_class, _DEFAULT_CLOTHING),
+        _TIPS_TAIL,
+    ]
+    
+    return "".join(out)
+
+
+# Tabella di dispatch: nome del tool -> funzione che produce il testo della risposta
+_HANDLERS = {
+    "suggest_activities": suggest_activities,
+    "suggest_restaurants": suggest_restaurants,
+    "create_itinerary": create_itinerary,
+    "get_travel_tips": get_travel_tips,
+}
 
 
 @server.call_tool()
 async def call_tool(name: str, arguments: Any) -> list[TextContent]:
     """Gestisce le chiamate agli strumenti"""
+    handler = _HANDLERS.get(name)
+    if handler is None:
+        return [TextContent(type="text", text=f"Strumento sconosciuto: {name}")]
     
     try:
-        if name == "suggest_activities":
-            location = arguments["location"]
-            weather_condition = arguments["weather_condition"]
-            temperature = arguments["temperature"]
-            preferences = arguments.get("preferences", [])
-            duration = arguments.get("duration", "medium")
-            
-            # Classifica il meteo
-            weather_class = classify_weather(weather_condition, temperature)
-            
-            # Determina se preferire indoor o outdoor
-            prefer_indoor = weather_class in ["rain", "snow", "cold", "hot"]
-            
-            # Filtra attività
-            suitable_activities = []
-            
-            # Priorità: indoor se brutto tempo, outdoor se bello
-            primary_category = "indoor" if prefer_indoor else "outdoor"
-            secondary_category = "outdoor" if prefer_indoor else "indoor"
-            
-            for activity in ACTIVITIES_DB[primary_category]:
-                if weather_class in activity["suitable_weather"] or "any" in activity["suitable_weather"]:
-                    if not preferences or activity["type"] in preferences:
-                        suitable_activities.append(activity)
-            
-            # Aggiungi attività mixed
-            for activity in ACTIVITIES_DB["mixed"]:
-                if not preferences or activity["type"] in preferences:
-                    suitable_activities.append(activity)
-            
-            # Se poche attività, aggiungi dalla categoria secondaria
-            if len(suitable_activities) < 3:
-                for activity in ACTIVITIES_DB[secondary_category]:
-                    if not preferences or activity["type"] in preferences:
-                        suitable_activities.append(activity)
-            
-            # Limita in base alla durata
-            if duration == "short":
-                suitable_activities = [a for a in suitable_activities if "1-2" in a["duration"]]
-            
-            # Formatta risultato
-            result = f"**Attività consigliate per {location}**\n\n"
-            result += f"🌡️ Meteo: {weather_condition}, {temperature}°C\n"
-            result += f"📊 Condizioni: {'Al coperto consigliato' if prefer_indoor else 'Perfetto per stare all\'aperto'}\n\n"
-            
-            for i, activity in enumerate(suitable_activities[:5], 1):
-                result += f"{i}. **{activity['name']}**\n"
-                result += f"   - {activity['description']}\n"
-                result += f"   - Durata: {activity['duration']}\n"
-                result += f"   - Tipo: {activity['type']}\n\n"
-            
-            return [TextContent(type="text", text=result)]
-        
-        elif name == "suggest_restaurants":
-            location = arguments["location"]
-            meal_type = arguments.get("meal_type", "lunch")
-            cuisine_type = arguments.get("cuisine_type", "tradizionale")
-            budget = arguments.get("budget", "€€")
-            
-            # Ottieni ristoranti per località
-            restaurants = RESTAURANTS_DB.get(location, RESTAURANTS_DB["default"])
-            
-            # Filtra per budget
-            filtered = [r for r in restaurants if r["price"] == budget or budget == "€€"]
-            
-            result = f"**Ristoranti consigliati a {location}**\n\n"
-            result += f"🍽️ Pasto: {meal_type}\n"
-            result += f"💰 Budget: {budget}\n\n"
-            
-            for i, restaurant in enumerate(filtered[:3], 1):
-                result += f"{i}. **{restaurant['name']}**\n"
-                result += f"   - Tipo: {restaurant['type']}\n"
-                result += f"   - Specialità: {restaurant['specialty']}\n"
-                result += f"   - Prezzo: {restaurant['price']}\n\n"
-            
-            return [TextContent(type="text", text=result)]
-        
-        elif name == "create_itinerary":
-            location = arguments["location"]
-            activities = arguments["activities"]
-            restaurants = arguments.get("restaurants", [])
-            start_time = arguments.get("start_time", "09:00")
-            
-            result = f"# 📅 Itinerario per {location}\n\n"
-            result += f"**Inizio:** {start_time}\n\n"
-            
-            # Crea timeline
-            times = ["09:00", "11:00", "13:00", "15:00", "17:00", "19:00"]
-            timeline = []
-            
-            # Alterna attività e ristoranti
-            for i, activity in enumerate(activities[:3]):
-                timeline.append((times[i*2], activity, "activity"))
-                if i < len(restaurants):
-                    timeline.append((times[i*2+1], restaurants[i], "restaurant"))
-            
-            for time, item, type in timeline:
-                icon = "🎯" if type == "activity" else "🍽️"
-                result += f"**{time}** {icon} {item}\n\n"
-            
-            result += "\n💡 **Consigli:**\n"
-            result += "- Porta sempre un ombrello pieghevole\n"
-            result += "- Prenota i ristoranti in anticipo\n"
-            result += "- Usa i mezzi pubblici o cammina\n"
-            
-            return [TextContent(type="text", text=result)]
-        
-        elif name == "get_travel_tips":
-            location = arguments["location"]
-            weather_condition = arguments["weather_condition"]
-            temperature = arguments["temperature"]
-            
-            weather_class = classify_weather(weather_condition, temperature)
-            
-            result = f"**Consigli di Viaggio per {location}**\n\n"
-            
-            # Abbigliamento
-            result += "👕 **Abbigliamento:**\n"
-            if weather_class == "rain":
-                result += "- Giacca impermeabile, ombrello, scarpe chiuse\n"
-            elif weather_class == "cold":
-                result += "- Cappotto, sciarpa, guanti, cappello\n"
-            elif weather_class == "hot":
-                result += "- Abbigliamento leggero, cappello, crema solare\n"
-            else:
-                result += "- Vestiti a strati, giacca leggera\n"
-            
-            result += "\n🎒 **Cosa portare:**\n"
-            result += "- Bottiglia d'acqua riutilizzabile\n"
-            result += "- Power bank per smartphone\n"
-            result += "- Mappa offline della città\n"
-            
-            result += "\n🚇 **Trasporti:**\n"
-            result += "- Acquista biglietti giornalieri per risparmiare\n"
-            result += "- App utili: Google Maps, Moovit\n"
-            
-            return [TextContent(type="text", text=result)]
-        
-        else:
-            return [TextContent(type="text", text=f"Strumento sconosciuto: {name}")]
-    
+        return [TextContent(type="text", text=handler(arguments))]
     except Exception as e:
         return [TextContent(type="text", text=f"Errore: {str(e)}")]
 